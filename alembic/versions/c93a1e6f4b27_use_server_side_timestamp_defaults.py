@@ -0,0 +1,34 @@
+"""Use server-side timestamp defaults
+
+Revision ID: c93a1e6f4b27
+Revises: b7e2d5a0c318
+Create Date: 2026-10-14 11:41:06.772913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c93a1e6f4b27'
+down_revision: Union[str, None] = 'b7e2d5a0c318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('users', 'created_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+    op.alter_column('leads', 'created_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+    op.alter_column('leads', 'status', existing_type=sa.String(), server_default='unassigned')
+    op.alter_column('assignments', 'assigned_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+    op.alter_column('pre_leads', 'created_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    op.alter_column('pre_leads', 'created_at', existing_type=sa.DateTime(), server_default=None)
+    op.alter_column('assignments', 'assigned_at', existing_type=sa.DateTime(), server_default=None)
+    op.alter_column('leads', 'status', existing_type=sa.String(), server_default=None)
+    op.alter_column('leads', 'created_at', existing_type=sa.DateTime(), server_default=None)
+    op.alter_column('users', 'created_at', existing_type=sa.DateTime(), server_default=None)
@@ -0,0 +1,48 @@
+"""Use timezone-aware timestamps
+
+Revision ID: d5f08b3c6a92
+Revises: c93a1e6f4b27
+Create Date: 2026-10-14 12:20:54.103862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f08b3c6a92'
+down_revision: Union[str, None] = 'c93a1e6f4b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs whose naive timestamps were written in UTC
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at'),
+    ('users', 'last_location_update'),
+    ('leads', 'created_at'),
+    ('assignments', 'assigned_at'),
+    ('pre_leads', 'created_at'),
+    ('pre_leads', 'converted_at'),
+]
+
+
+def upgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(),
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
@@ -1,18 +1,53 @@
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import chain
 from typing import Optional
+import asyncio
+import threading
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, make_transient_to_detached
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer
 
 from database import get_db, User
 from config import settings
+from queries import USER_BY_EMAIL
 import schemas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2; existing bcrypt hashes still verify and are
+# upgraded on the user's next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=1,
+)
 security = HTTPBearer()
 
+@lru_cache(maxsize=1)
+def get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated thread pool for password hashing
+    argon2-cffi and bcrypt release the GIL while hashing, so the threads run
+    in parallel; the worker cap bounds how many 64 MiB argon2 hashes run at once.
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix="password-hash",
+    )
+
+def shutdown_hash_executor():
+    if get_hash_executor.cache_info().currsize:
+        get_hash_executor().shutdown()
+        get_hash_executor.cache_clear()
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -20,27 +55,92 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+    return db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
+
+# Short-lived cache of authenticated users so chatty clients don't hit the
+# users table on every request. Entries are detached snapshots merged into
+# the request session; committing any change to a user bumps its epoch,
+# which retires every snapshot taken before the change (in this process
+# only, see settings.USER_CACHE_TTL).
+_user_cache = TTLCache(maxsize=1024, ttl=settings.USER_CACHE_TTL)
+_user_epochs = {}
+_cache_generation = 0
+_user_cache_lock = threading.Lock()
+
+def _snapshot(user: User) -> User:
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
 
-def authenticate_user(db: Session, email: str, password: str):
+def invalidate_cached_user(user_id: int):
+    global _cache_generation
+    with _user_cache_lock:
+        _cache_generation += 1
+        _user_epochs[user_id] = _cache_generation
+
+def get_cached_user(db: Session, email: str):
+    with _user_cache_lock:
+        entry = _user_cache.get(email)
+        generation = _cache_generation
+    if entry is not None:
+        snapshot, cached_at = entry
+        if _user_epochs.get(snapshot.id, 0) <= cached_at:
+            return db.merge(snapshot, load=False)
+    
     user = get_user_by_email(db, email)
+    if user is not None:
+        with _user_cache_lock:
+            _user_cache[email] = (_snapshot(user), generation)
+    return user
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    changed.update(obj.id for obj in chain(session.dirty, session.deleted) if isinstance(obj, User))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_cached_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
+def verify_and_update_password(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# Verified against when the email is unknown, so a miss costs the same as a
+# wrong password and response timing doesn't reveal which emails exist
+_DUMMY_HASH = "$argon2id$v=19$m=65536,t=2,p=1$rfU+JyRkbO3de09pTWmNMQ$yixfVPk7hSHLDGILrI1F7RGFmB3/TZatKxa4JMJ3QL4"
+
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    verified, new_hash = await asyncio.get_running_loop().run_in_executor(
+        get_hash_executor(), verify_and_update_password, password,
+        user.hashed_password if user else _DUMMY_HASH
+    )
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not verified:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+        expire = now + timedelta(minutes=15)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -54,12 +154,40 @@ async def get_current_user(token: str = Depends(security), db: Session = Depends
         token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user_by_email(db, email=token_data.email)
+    user = get_cached_user(db, email=token_data.email)
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def refresh_current_user(db: Session, user: User):
+    """
+    Re-read a possibly cached user from the database before writing to its row
+    Another worker may have deleted or deactivated the user since it was
+    cached; writing to the stale snapshot would raise StaleDataError.
+    """
+    try:
+        db.refresh(user)
+    except InvalidRequestError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
+class RoleChecker:
+    """Dependency that returns the current user if their role is allowed, else raises 403"""
+    def __init__(self, roles, detail: str = "Not enough permissions"):
+        self.roles = frozenset(roles)
+        self.detail = detail
+
+    def __call__(self, current_user: User = Depends(get_current_active_user)):
+        if current_user.role not in self.roles:
+            raise HTTPException(status_code=403, detail=self.detail)
+        return current_user
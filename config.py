@@ -1,5 +1,7 @@
 import os
-from typing import Optional
+from functools import cached_property, lru_cache
+from typing import ClassVar, List, Optional
+from pydantic import computed_field
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +11,23 @@ class Settings(BaseSettings):
         "sqlite:///./data/crm_production.sqlite3"
     )
     
+    # Database connection pool (PostgreSQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "30"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds
+    
+    # Threads for password hashing (caps concurrent argon2 memory use)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # Seconds an authenticated user stays cached (0 disables the cache).
+    # Invalidation on user changes only reaches the process that made them, so
+    # with several uvicorn workers a deleted or deactivated user can keep
+    # authenticating on the other workers for up to this long
+    USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", "30"))
+    
+    # Per-client rate limit for /login (slowapi/limits syntax)
+    LOGIN_RATE_LIMIT: str = os.getenv("LOGIN_RATE_LIMIT", "10/minute")
+    
     # JWT Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "bonhoeffer-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
@@ -17,29 +36,34 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
+    # Serve /uploads from the app; turn off when a reverse proxy (nginx) serves it
+    SERVE_UPLOADS: bool = os.getenv("SERVE_UPLOADS", "true").lower() == "true"
+    
     # Frontend URL
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "https://localhost:3000")
     
     # CORS Origins
-    @property
-    def CORS_ORIGINS(self) -> list:
+    PRODUCTION_CORS_ORIGINS: ClassVar[List[str]] = [
+        "http://localhost:3000",  # Keep for local testing
+        "http://127.0.0.1:3000",
+        "https://*.vercel.app",
+        "https://crm.nakul.click",
+    ]
+    DEVELOPMENT_CORS_ORIGINS: ClassVar[List[str]] = [
+        "http://localhost:3000", 
+        "http://127.0.0.1:3000",
+        "https://crm.nakul.click",
+        "https://*.vercel.app",
+        "https://*.ngrok.io",
+        "https://*.ngrok-free.app"
+    ]
+    
+    @computed_field
+    @cached_property
+    def CORS_ORIGINS(self) -> List[str]:
         if self.ENVIRONMENT == "production":
-            return [
-                "http://localhost:3000",  # Keep for local testing
-                "http://127.0.0.1:3000",
-                self.FRONTEND_URL,
-                "https://*.vercel.app",
-                "https://crm.nakul.click",
-            ]
-        else:
-            return [
-                "http://localhost:3000", 
-                "http://127.0.0.1:3000",
-                "https://crm.nakul.click",
-                "https://*.vercel.app",
-                "https://*.ngrok.io",
-                "https://*.ngrok-free.app"
-            ]
+            return [*self.PRODUCTION_CORS_ORIGINS, self.FRONTEND_URL]
+        return list(self.DEVELOPMENT_CORS_ORIGINS)
     
     # Email (for notifications)
     SMTP_SERVER: str = "smtp.gmail.com"
@@ -50,4 +74,8 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+settings = get_settings()
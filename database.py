@@ -1,148 +1,254 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy import create_engine, event, insert, inspect, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker, relationship
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional
 import os
 
 from config import settings
 
-# Configure engine based on environment
-if settings.ENVIRONMENT == "production":
-    if settings.DATABASE_URL.startswith("sqlite"):
-        # Optimized SQLite configuration for production
+@lru_cache(maxsize=1)
+def get_engine():
+    """Create the engine on first use so importing this module stays cheap"""
+    # Configure engine based on environment
+    if settings.ENVIRONMENT == "production":
+        if settings.DATABASE_URL.startswith("sqlite"):
+            # Optimized SQLite configuration for production
+            engine = create_engine(
+                settings.DATABASE_URL,
+                # SQLite-specific optimizations
+                connect_args={
+                    "check_same_thread": False,  # Allow multiple threads
+                    "timeout": 60,  # Increased timeout for writes
+                },
+                # Connection pooling: sized like PostgreSQL so the 40-thread
+                # pool running sync routes never queues on a connection
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_pre_ping=False,  # Local file: no network link to go stale
+                pool_timeout=60,  # Wait up to 60 seconds for a connection
+                # Performance optimizations
+                echo=False  # Set to True for debugging
+            )
+        else:
+            # PostgreSQL/other database configuration
+            engine = create_engine(
+                settings.DATABASE_URL,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_pre_ping=True,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_use_lifo=True  # Reuse the most recently returned (warm) connection
+            )
+    else:
+        # Development configuration
         engine = create_engine(
             settings.DATABASE_URL,
-            # SQLite-specific optimizations
-            connect_args={
-                "check_same_thread": False,  # Allow multiple threads
-                "timeout": 60,  # Increased timeout for writes
-                "isolation_level": None,  # Autocommit mode
-            },
-            # Connection pooling (optimized for SQLite)
-            pool_size=5,  # Allow multiple connections for reading
-            max_overflow=10,  # Allow overflow connections
-            pool_pre_ping=True,
-            pool_recycle=3600,  # Recycle connections every hour
-            pool_timeout=60,  # Wait up to 60 seconds for a connection
-            # Performance optimizations
-            echo=False  # Set to True for debugging
+            connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW
         )
-        
-        # Apply SQLite-specific PRAGMA settings for performance
-        from sqlalchemy import event
-        
+
+    if settings.DATABASE_URL.startswith("sqlite"):
+        # Apply SQLite-specific PRAGMA settings in every environment
         @event.listens_for(engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
             cursor = dbapi_connection.cursor()
             # Performance optimizations
             cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging
             cursor.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL
-            cursor.execute("PRAGMA cache_size=10000")  # 10MB cache
+            cursor.execute("PRAGMA cache_size=-64000")  # ~64MB page cache (negative = KiB)
             cursor.execute("PRAGMA temp_store=MEMORY")  # Temp tables in memory
             cursor.execute("PRAGMA mmap_size=268435456")  # 256MB memory map
+            cursor.execute("PRAGMA wal_autocheckpoint=1000")  # Checkpoint every 1000 pages
+            # Integrity
+            cursor.execute("PRAGMA foreign_keys=ON")  # SQLite ignores FKs unless asked
             cursor.execute("PRAGMA optimize")  # Auto-optimize
             cursor.close()
-    else:
-        # PostgreSQL/other database configuration
-        engine = create_engine(
-            settings.DATABASE_URL,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            pool_recycle=300
-        )
-else:
-    # Development configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-    )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+    return engine
+
+@lru_cache(maxsize=1)
+def get_sessionmaker():
+    # expire_on_commit=False: handlers return the committed objects straight
+    # to the response model, so don't reload every attribute after commit
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=get_engine())
+
+def utcnow() -> datetime:
+    """Timezone-aware UTC timestamp used for row defaults"""
+    return datetime.now(timezone.utc)
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamp that always comes back timezone-aware in UTC
+    SQLite drops tzinfo on the round trip, so without this a row read from
+    the database serializes differently from the same row still in memory.
+    Values are stored as naive UTC on SQLite and as timestamptz elsewhere.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(timezone.utc)
+        return value.replace(tzinfo=None) if dialect.name == "sqlite" else value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+class Base(DeclarativeBase):
+    pass
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    full_name = Column(String, nullable=False)
-    role = Column(String, nullable=False)  # 'crm', 'salesperson', 'admin'
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    hashed_password: Mapped[str] = mapped_column(String, nullable=False)
+    full_name: Mapped[str] = mapped_column(String, nullable=False)
+    role: Mapped[str] = mapped_column(String, nullable=False)  # 'crm', 'salesperson', 'admin'
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(UTCDateTime, default=utcnow, server_default=func.now())
     
     # Salesperson specific fields
-    phone = Column(String)
-    designation = Column(String)
-    photo_url = Column(String)
-    current_latitude = Column(Float)
-    current_longitude = Column(Float)
-    last_location_update = Column(DateTime)
-    status = Column(String, default="available")  # 'available', 'busy'
-    territory = Column(String)  # Territory/State assignment
+    phone: Mapped[Optional[str]] = mapped_column(String)
+    designation: Mapped[Optional[str]] = mapped_column(String)
+    photo_url: Mapped[Optional[str]] = mapped_column(String)
+    current_latitude: Mapped[Optional[float]] = mapped_column(Float)
+    current_longitude: Mapped[Optional[float]] = mapped_column(Float)
+    last_location_update: Mapped[Optional[datetime]] = mapped_column(UTCDateTime)
+    status: Mapped[Optional[str]] = mapped_column(String, default="available")  # 'available', 'busy'
+    territory: Mapped[Optional[str]] = mapped_column(String)  # Territory/State assignment
     
     # Relationships
-    assignments = relationship("Assignment", back_populates="salesperson", foreign_keys="Assignment.salesperson_id")
+    assignments: Mapped[List["Assignment"]] = relationship(back_populates="salesperson", foreign_keys="Assignment.salesperson_id")
+
+    __table_args__ = (
+        Index("ix_users_role_territory", "role", "territory"),
+        Index("ix_users_role_latlon", "role", "current_latitude", "current_longitude"),  # Covers /salespersons/nearby
+    )
 
 class Lead(Base):
     __tablename__ = "leads"
     
-    id = Column(Integer, primary_key=True, index=True)
-    company_name = Column(String, nullable=False)
-    contact_person = Column(String, nullable=False)
-    phone = Column(String)
-    email = Column(String)
-    address = Column(Text)
-    latitude = Column(Float, nullable=False)
-    longitude = Column(Float, nullable=False)
-    status = Column(String, default="unassigned")  # 'unassigned', 'assigned', 'contacted', 'closed'
-    priority = Column(String, default="warm")  # 'hot', 'warm', 'cold'
-    estimated_value = Column(Float)
-    notes = Column(Text)
-    created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=func.now())
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    company_name: Mapped[str] = mapped_column(String, nullable=False)
+    contact_person: Mapped[str] = mapped_column(String, nullable=False)
+    phone: Mapped[Optional[str]] = mapped_column(String)
+    email: Mapped[Optional[str]] = mapped_column(String)
+    address: Mapped[Optional[str]] = mapped_column(Text)
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    status: Mapped[Optional[str]] = mapped_column(String, default="unassigned", server_default="unassigned")  # 'unassigned', 'assigned', 'contacted', 'closed'
+    priority: Mapped[Optional[str]] = mapped_column(String, default="warm")  # 'hot', 'warm', 'cold'
+    estimated_value: Mapped[Optional[float]] = mapped_column(Float)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), index=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(UTCDateTime, default=utcnow, server_default=func.now())
     
     # Relationships
-    assignments = relationship("Assignment", back_populates="lead")
+    assignments: Mapped[List["Assignment"]] = relationship(back_populates="lead")
+
+    __table_args__ = (
+        Index("ix_leads_status_priority", "status", "priority"),
+        Index("ix_leads_status_latlon", "status", "latitude", "longitude"),  # Covers map queries on unassigned leads
+    )
 
 class Assignment(Base):
     __tablename__ = "assignments"
     
-    id = Column(Integer, primary_key=True, index=True)
-    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
-    salesperson_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    assigned_by = Column(Integer, ForeignKey("users.id"))
-    assigned_at = Column(DateTime, default=func.now())
-    status = Column(String, default="pending")  # 'pending', 'accepted', 'completed', 'rejected'
-    notes = Column(Text)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    lead_id: Mapped[int] = mapped_column(Integer, ForeignKey("leads.id"), nullable=False, index=True)
+    salesperson_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    assigned_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), index=True)
+    assigned_at: Mapped[Optional[datetime]] = mapped_column(UTCDateTime, default=utcnow, server_default=func.now())
+    status: Mapped[Optional[str]] = mapped_column(String, default="pending")  # 'pending', 'accepted', 'completed', 'rejected'
+    notes: Mapped[Optional[str]] = mapped_column(Text)
     
     # Relationships
-    lead = relationship("Lead", back_populates="assignments")
-    salesperson = relationship("User", back_populates="assignments", foreign_keys=[salesperson_id])
+    lead: Mapped["Lead"] = relationship(back_populates="assignments")
+    salesperson: Mapped["User"] = relationship(back_populates="assignments", foreign_keys=[salesperson_id])
+
+    __table_args__ = (
+        Index("ix_assignments_sp_status", "salesperson_id", "status"),
+    )
 
 class PreLead(Base):
     __tablename__ = "pre_leads"
     
-    id = Column(Integer, primary_key=True, index=True)
-    company_name = Column(String, nullable=False)
-    country = Column(String, nullable=False)
-    reason = Column(Text, nullable=False)  # Reason for prospecting
-    source = Column(String, nullable=False)  # Source of the lead (referral, cold call, etc.)
-    classification = Column(String, default="warm")  # 'hot', 'warm', 'cold'
-    notes = Column(Text)
-    created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=func.now())
-    converted_to_lead_id = Column(Integer, ForeignKey("leads.id"), nullable=True)  # Track if converted
-    converted_at = Column(DateTime, nullable=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    company_name: Mapped[str] = mapped_column(String, nullable=False)
+    country: Mapped[str] = mapped_column(String, nullable=False)
+    reason: Mapped[str] = mapped_column(Text, nullable=False)  # Reason for prospecting
+    source: Mapped[str] = mapped_column(String, nullable=False)  # Source of the lead (referral, cold call, etc.)
+    classification: Mapped[Optional[str]] = mapped_column(String, default="warm")  # 'hot', 'warm', 'cold'
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), index=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(UTCDateTime, default=utcnow, server_default=func.now())
+    converted_to_lead_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("leads.id"), nullable=True, index=True)  # Track if converted
+    converted_at: Mapped[Optional[datetime]] = mapped_column(UTCDateTime, nullable=True)
     
     # Relationships
-    creator = relationship("User", foreign_keys=[created_by])
-    converted_lead = relationship("Lead", foreign_keys=[converted_to_lead_id])
+    creator: Mapped[Optional["User"]] = relationship(foreign_keys=[created_by])
+    converted_lead: Mapped[Optional["Lead"]] = relationship(foreign_keys=[converted_to_lead_id])
+
+def create_missing_indexes(engine) -> int:
+    """
+    Create any model index the database doesn't have yet
+    create_all() skips tables that already exist, so databases created before
+    an index was added to the models never get it; returns how many were created
+    """
+    created = 0
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created += 1
+    return created
+
+def _bulk_insert(db, model, rows: List[dict]) -> List[int]:
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, rows))
+    # Older SQLite builds can't RETURNING from an executemany; fall back to the
+    # legacy bulk API, which writes the generated ids back into the dicts
+    db.bulk_insert_mappings(model, rows, return_defaults=True)
+    return [row["id"] for row in rows]
+
+def bulk_insert_leads(db, rows: List[dict]) -> List[int]:
+    """
+    Insert many leads with a single executemany round trip
+    Returns the new lead ids in the same order as rows
+    """
+    if not rows:
+        return []
+    # One timestamp for the whole batch instead of a default call per row
+    now = utcnow()
+    return _bulk_insert(db, Lead, [{"created_at": now, **row} for row in rows])
+
+def bulk_insert_users(db, rows: List[dict]) -> List[int]:
+    """
+    Insert many users with a single executemany round trip
+    Returns the new user ids in the same order as rows
+    """
+    if not rows:
+        return []
+    now = utcnow()
+    return _bulk_insert(db, User, [{"created_at": now, **row} for row in rows])
 
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
@@ -8,7 +8,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import engine, SessionLocal, User, Base
+from sqlalchemy import func, text
+
+from database import get_engine, get_sessionmaker, User
 from config import settings
 import traceback
 
@@ -20,8 +22,8 @@ def test_database_connection():
         print(f"🌍 Environment: {settings.ENVIRONMENT}")
         
         # Test connection
-        with engine.connect() as connection:
-            result = connection.execute("SELECT 1")
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
             print("✅ Database connection successful!")
             return True
             
@@ -35,14 +37,10 @@ def test_tables():
     try:
         print(f"🗄️  Testing database tables...")
         
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created/verified!")
-        
-        # Test user table
-        db = SessionLocal()
+        # Test user table (schema creation is left to Alembic / app startup)
+        db = get_sessionmaker()()
         try:
-            user_count = db.query(User).count()
+            user_count = db.query(func.count(User.id)).scalar()
             print(f"👥 Found {user_count} users in database")
             
             if user_count > 0:
@@ -1,32 +1,83 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from starlette.formparsers import MultiPartParser
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session, joinedload, raiseload
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 import os
+import sys
 import uuid
 from pathlib import Path
-import shutil
-import requests
+from urllib.parse import urlsplit
+import asyncio
+import httpx
+import orjson
 import re
 
 import schemas
-from database import get_db, User, Lead, Assignment, PreLead, engine, Base
+from database import get_db, get_engine, bulk_insert_users, create_missing_indexes, User, Lead, Assignment, PreLead, Base
 from auth import (
-    authenticate_user, create_access_token, get_current_active_user,
-    get_password_hash, get_user_by_email
+    authenticate_user, create_access_token, get_current_active_user, refresh_current_user,
+    get_password_hash, get_hash_executor, shutdown_hash_executor,
+    RoleChecker
 )
-from utils import sort_salespeople_by_distance
+from queries import EMAIL_TAKEN, USER_PUBLIC, SALESPERSONS, NEARBY_SALESPERSONS, ASSIGNMENTS, ASSIGNMENTS_BY_SALESPERSON, LEAD_WITH_SALESPERSON, USER_ROWS, LEAD_ROWS
+from utils import bounding_box, sort_salespeople_by_distance
 from config import settings
 
-app = FastAPI(title="Bonhoeffer Machines CRM API", version="1.0.0")
+# Role-gated current-user dependencies
+require_admin = RoleChecker({"admin"})
+require_crm = RoleChecker({"crm", "admin"})
+require_management = RoleChecker({"admin", "hr", "executive"})
+
+def json_list(adapter, items) -> Response:
+    """
+    Serialize a list of schema instances in one TypeAdapter.dump_json call
+    Returning a Response skips FastAPI's per-response re-validation; the
+    route's response_model still documents the shape
+    """
+    return Response(content=adapter.dump_json(items), media_type="application/json")
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson instead of the stdlib json module"""
+    async def json(self):
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still turns malformed bodies into its usual 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route class that hands endpoints (and their body parsing) an ORJSONRequest"""
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request):
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+app = FastAPI(title="Bonhoeffer Machines CRM API", version="1.0.0", default_response_class=ORJSONResponse)
+app.router.route_class = ORJSONRoute
+
+# Rate limiting (per client IP) for the login endpoint
+limiter = Limiter(key_func=get_remote_address)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Initialize database on startup
 @app.on_event("startup")
 def startup_event():
-    """Initialize database and seed data if needed"""
+    """Initialize database tables and indexes"""
     try:
         # Ensure data directory exists for SQLite
         import os
@@ -34,52 +85,14 @@ def startup_event():
         print("📁 Data directory created/verified")
         
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         print("✅ Database tables created/verified")
         
-        # Check if we need to seed data with retry logic
-        import time
-        for attempt in range(3):  # Try up to 3 times
-            try:
-                # Use a fresh session for seeding
-                from sqlalchemy.orm import sessionmaker
-                SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-                db = SessionLocal()
-                
-                try:
-                    user_count = db.query(User).count()
-                    if user_count == 0:
-                        print(f"🌱 No users found (attempt {attempt + 1}/3). Seeding initial data...")
-                        db.close()  # Close before seeding
-                        
-                        # Import and run seed function
-                        from seed_data import main as seed_main
-                        seed_main()
-                        print("✅ Initial data seeded successfully!")
-                        break
-                    else:
-                        print(f"👥 Found {user_count} users. Database already initialized.")
-                        break
-                        
-                except Exception as query_error:
-                    print(f"⚠️ Query error on attempt {attempt + 1}: {query_error}")
-                    if attempt < 2:  # Not the last attempt
-                        time.sleep(2)  # Wait 2 seconds before retrying
-                        continue
-                    else:
-                        raise query_error
-                finally:
-                    db.close()
-                    
-            except Exception as seed_error:
-                print(f"⚠️ Seeding error on attempt {attempt + 1}: {seed_error}")
-                if attempt < 2:  # Not the last attempt
-                    time.sleep(5)  # Wait 5 seconds before retrying
-                    continue
-                else:
-                    print("❌ Failed to seed after 3 attempts. Application will start without initial data")
-                    break
-            
+        # Add indexes introduced after the tables were first created
+        new_indexes = create_missing_indexes(get_engine())
+        if new_indexes:
+            print(f"🗂️ Created {new_indexes} missing index(es)")
+        
     except Exception as e:
         print(f"❌ Database initialization error: {e}")
         print("🚀 Application will start anyway")
@@ -87,12 +100,105 @@ def startup_event():
         import traceback
         traceback.print_exc()
 
+def seed_if_empty():
+    """Seed demo data into an empty database, retrying transient failures"""
+    import time
+    for attempt in range(3):  # Try up to 3 times
+        try:
+            # Plain connection is enough for the count; no ORM session needed
+            try:
+                with get_engine().connect() as conn:
+                    user_count = conn.execute(text("SELECT COUNT(*) FROM users")).scalar()
+                if user_count == 0:
+                    print(f"🌱 No users found (attempt {attempt + 1}/3). Seeding initial data...")
+                    
+                    # Import and run seed function
+                    from seed_data import main as seed_main
+                    seed_main()
+                    print("✅ Initial data seeded successfully!")
+                    break
+                else:
+                    print(f"👥 Found {user_count} users. Database already initialized.")
+                    break
+                    
+            except Exception as query_error:
+                print(f"⚠️ Query error on attempt {attempt + 1}: {query_error}")
+                if attempt < 2:  # Not the last attempt
+                    time.sleep(2)  # Wait 2 seconds before retrying
+                    continue
+                else:
+                    raise query_error
+                
+        except Exception as seed_error:
+            print(f"⚠️ Seeding error on attempt {attempt + 1}: {seed_error}")
+            if attempt < 2:  # Not the last attempt
+                time.sleep(5)  # Wait 5 seconds before retrying
+                continue
+            else:
+                print("❌ Failed to seed after 3 attempts. Application continues without initial data")
+                break
+
+# Background seeding task; kept referenced so it isn't garbage collected
+seed_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_seeding():
+    """Seed in a worker thread so the server accepts requests (e.g. /health) right away"""
+    global seed_task
+    seed_task = asyncio.create_task(run_in_threadpool(seed_if_empty))
+
+# Shared client for outbound requests (short-URL resolution)
+http_client: Optional[httpx.AsyncClient] = None
+
+@app.on_event("startup")
+async def open_http_client():
+    global http_client
+    http_client = httpx.AsyncClient(timeout=10, follow_redirects=True)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    if http_client is not None:
+        await http_client.aclose()
+
+@app.on_event("shutdown")
+def close_hash_executor():
+    shutdown_hash_executor()
+
 # Create uploads directory if it doesn't exist
-uploads_dir = Path("uploads")
-uploads_dir.mkdir(exist_ok=True)
+UPLOADS_DIR = Path("uploads")
+UPLOADS_DIR.mkdir(exist_ok=True)
+
+# Mount static files for uploaded images (unless a reverse proxy serves them)
+if settings.SERVE_UPLOADS:
+    app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+# Allowance for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
 
-# Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+class UploadSizeLimitMiddleware:
+    """
+    Refuse uploads whose declared Content-Length is over the limit before the body is read
+    Plain ASGI so every other route passes straight through without the
+    BaseHTTPMiddleware request/response wrapping.
+    """
+    def __init__(self, app, path: str = "/upload-profile-picture"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.app(scope, receive, send)
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+                    response = ORJSONResponse(status_code=413, content={"detail": "File size must be less than 5MB"})
+                    return await response(scope, receive, send)
+                break
+        await self.app(scope, receive, send)
+
+# Added before CORS so the 413 still carries the CORS headers
+app.add_middleware(UploadSizeLimitMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -110,10 +216,10 @@ async def health_check():
 
 # Seed database endpoint (for manual seeding if needed)
 @app.post("/seed-database")
-async def seed_database(db: Session = Depends(get_db)):
+def seed_database(db: Session = Depends(get_db)):
     """Manually seed the database with initial data"""
     try:
-        user_count = db.query(User).count()
+        user_count = db.query(func.count(User.id)).scalar()
         if user_count > 0:
             return {"message": f"Database already has {user_count} users. Skipping seed."}
         
@@ -122,7 +228,7 @@ async def seed_database(db: Session = Depends(get_db)):
         seed_main()
         
         # Verify seeding worked
-        new_user_count = db.query(User).count()
+        new_user_count = db.query(func.count(User.id)).scalar()
         return {
             "message": "Database seeded successfully!",
             "users_created": new_user_count
@@ -136,8 +242,9 @@ async def seed_database(db: Session = Depends(get_db)):
 
 # Auth endpoints
 @app.post("/login", response_model=schemas.Token)
-async def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(db, login_data.email, login_data.password)
+@limiter.limit(settings.LOGIN_RATE_LIMIT)
+async def login(request: Request, login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
+    user = await authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -155,12 +262,12 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @app.put("/users/{user_id}", response_model=schemas.User)
-async def update_user(user_id: int, user_update: schemas.UserUpdate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+def update_user(user_id: int, user_update: schemas.UserUpdate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
     # Users can only update their own profile
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="You can only update your own profile")
     
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -170,9 +277,94 @@ async def update_user(user_id: int, user_update: schemas.UserUpdate, current_use
         setattr(db_user, field, value)
     
     db.commit()
-    db.refresh(db_user)
     return db_user
 
+try:
+    import hyperscan  # optional: single-pass prefilter for the coordinate patterns
+except ImportError:
+    hyperscan = None
+
+# A coordinate number can't begin inside a longer number; leading zeros are allowed
+_NUM_START = r'(?<!\d)(?<!\d\.)0*'
+
+def _lat(frac=r'(?:\.\d*)?'):
+    """Latitude in [-90, 90] with the given fractional part"""
+    zero = frac.replace(r'\d', '0')
+    return rf'(-?{_NUM_START}(?:[0-8]?\d{frac}|90{zero}))(?!\.?\d)'
+
+def _lng(frac=r'(?:\.\d*)?'):
+    """Longitude in [-180, 180] with the given fractional part"""
+    zero = frac.replace(r'\d', '0')
+    return rf'(-?{_NUM_START}(?:(?:1[0-7]\d|\d{{1,2}}){frac}|180{zero}))(?!\.?\d)'
+
+def _coord(template, frac=r'(?:\.\d*)?'):
+    """
+    Fill template's {lat}/{lng} slots with range-constrained groups
+    Returns the plain pattern and an anchored one. The anchored form skips
+    ahead only while the template's loose shape (any numbers) doesn't match,
+    so the pattern is judged on its first candidate: an out-of-range first
+    pair fails the pattern instead of shifting onto later numbers.
+    """
+    number = rf'-?\d+{frac}'
+    # {skip}: advance to the first number pair without passing over one
+    skip = rf'(?:(?!{number},{number}).)*?'
+    shape = template.format(lat=number, lng=number, skip=skip)
+    source = template.format(lat=_lat(frac), lng=_lng(frac), skip=skip)
+    return source, rf'^(?:(?!{shape}).)*?{source}'
+
+# Coordinate patterns for map URLs, tried in order (first match wins). The
+# numbers are range-constrained, so a match is always a valid coordinate;
+# the lookarounds stop a match from starting or ending inside a longer number.
+# re runs the anchored forms; the Hyperscan prefilter uses the plain ones
+_COORD_SOURCES, _ANCHORED_COORD_SOURCES = zip(
+    _coord('@{lat},{lng}'),
+    _coord('ll={lat},{lng}'),
+    _coord('q={lat},{lng}'),
+    _coord('!3d{lat}!4d{lng}'),
+    _coord('data={skip}{lat},{lng}'),
+    _coord('{lat},{lng}', r'\.\d{4,}'),
+    _coord('{lat},{lng}', r'\.\d+'),
+    # Handle /search/ URLs with coordinates like: /search/26.851325,+79.746548
+    _coord(r'/search/{lat},\+?{lng}'),
+    # Handle URLs with coordinates followed by comma and space/plus
+    _coord(r'{lat},\s*\+?{lng}'),
+)
+_COORD_PATTERNS = [re.compile(p, re.DOTALL) for p in _ANCHORED_COORD_SOURCES]
+
+# Hosts of shortened links that need a HEAD request to find the real maps URL
+_SHORTENERS = frozenset({"maps.app.goo.gl", "goo.gl", "bit.ly", "tinyurl.com"})
+
+def _build_coord_scanner():
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[p.encode() for p in _COORD_SOURCES],
+        ids=list(range(len(_COORD_SOURCES))),
+        elements=len(_COORD_SOURCES),
+        # PREFILTER: Hyperscan can't do lookbehinds, so it matches a superset
+        # of each pattern and re makes the final call
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER] * len(_COORD_SOURCES),
+    )
+    return db
+
+_coord_scanner = _build_coord_scanner()
+
+def _candidate_coord_patterns(url: str):
+    """Return the coordinate patterns that can match url, in priority order.
+
+    With Hyperscan available, one scan over the URL tells which patterns
+    match at all, so re only runs those (re is still needed for the
+    capture groups). Without it every pattern is a candidate.
+    """
+    if _coord_scanner is None:
+        return _COORD_PATTERNS
+    hits = set()
+    def on_match(pattern_id, start, end, flags, context):
+        hits.add(pattern_id)
+    _coord_scanner.scan(url.encode(), match_event_handler=on_match)
+    return [_COORD_PATTERNS[i] for i in sorted(hits)]
+
 @app.post("/resolve-url")
 async def resolve_url(url_data: dict):
     """
@@ -183,52 +375,88 @@ async def resolve_url(url_data: dict):
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
     
+    # Only web links are fetched or parsed (no file:// or other schemes)
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise HTTPException(status_code=400, detail="URL must use http or https")
+    
     try:
         # Check if it's a shortened URL that needs resolution
-        if any(domain in url for domain in ['maps.app.goo.gl', 'goo.gl/maps', 'bit.ly', 'tinyurl.com']):
+        if (parts.hostname or "").removeprefix("www.") in _SHORTENERS:
             # Resolve the shortened URL
-            response = requests.head(url, allow_redirects=True, timeout=10)
-            resolved_url = response.url
+            response = await http_client.head(url)
+            resolved_url = str(response.url)
         else:
             resolved_url = url
         
         # Extract coordinates using enhanced patterns
-        patterns = [
-            r'@(-?\d+\.?\d*),(-?\d+\.?\d*)',
-            r'll=(-?\d+\.?\d*),(-?\d+\.?\d*)',
-            r'q=(-?\d+\.?\d*),(-?\d+\.?\d*)',
-            r'!3d(-?\d+\.?\d*)!4d(-?\d+\.?\d*)',
-            r'data=.*?(-?\d+\.?\d*),(-?\d+\.?\d*)',
-            r'(-?\d+\.\d{4,}),(-?\d+\.\d{4,})',
-            r'(-?\d{1,3}\.\d+),(-?\d{1,3}\.\d+)',
-            # Handle /search/ URLs with coordinates like: /search/26.851325,+79.746548
-            r'/search/(-?\d+\.?\d*),\+?(-?\d+\.?\d*)',
-            # Handle URLs with coordinates followed by comma and space/plus
-            r'(-?\d+\.?\d*),\s*\+?(-?\d+\.?\d*)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, resolved_url)
+        for pattern in _candidate_coord_patterns(resolved_url):
+            match = pattern.search(resolved_url)
             if match:
                 lat = float(match.group(1))
                 lng = float(match.group(2))
-                
-                if -90 <= lat <= 90 and -180 <= lng <= 180:
-                    return {
-                        "success": True,
-                        "coordinates": {"lat": str(lat), "lng": str(lng)},
-                        "resolved_url": resolved_url
-                    }
+                assert -90 <= lat <= 90 and -180 <= lng <= 180
+                return {
+                    "success": True,
+                    "coordinates": {"lat": str(lat), "lng": str(lng)},
+                    "resolved_url": resolved_url
+                }
         
         return {"success": False, "error": "No valid coordinates found"}
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {"success": False, "error": f"Failed to resolve URL: {str(e)}"}
     except Exception as e:
         return {"success": False, "error": f"Error processing URL: {str(e)}"}
 
+# Starlette keeps uploads up to this size in memory, larger ones in a temp file
+SPOOL_MAX_SIZE = MultiPartParser.max_file_size
+
+def _sendfile_upload(src, buffer):
+    """Copy a disk-backed upload with os.sendfile (file-to-file only works on Linux)"""
+    src_fd = src.fileno()
+    offset = src.tell()
+    end = os.fstat(src_fd).st_size
+    if end - offset > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File size must be less than 5MB")
+    while offset < end:
+        sent = os.sendfile(buffer.fileno(), src_fd, offset, end - offset)
+        if not sent:
+            break
+        offset += sent
+
+def _save_upload(upload: UploadFile, file_path: Path):
+    """
+    Copy an uploaded file to file_path
+    The size limit is enforced on the bytes actually received (max 5MB);
+    the client-reported size can be missing or wrong
+    """
+    src = upload.file
+    with open(file_path, "wb") as buffer:
+        if sys.platform.startswith("linux") and (upload.size or 0) > SPOOL_MAX_SIZE:
+            # Larger uploads are already spooled to a temp file on disk;
+            # let the kernel copy it without a round trip through Python
+            start = src.tell()
+            try:
+                _sendfile_upload(src, buffer)
+                return
+            except OSError:
+                # e.g. a filesystem that doesn't support sendfile: copy below
+                # (sendfile with an offset leaves src's position untouched)
+                buffer.seek(0)
+                buffer.truncate()
+                src.seek(start)
+        # Reuse one 1MiB buffer for the whole copy instead of a new bytes per chunk
+        chunk = memoryview(bytearray(1024 * 1024))
+        written = 0
+        while n := src.readinto(chunk):
+            written += n
+            if written > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail="File size must be less than 5MB")
+            buffer.write(chunk[:n])
+
 @app.post("/upload-profile-picture")
-async def upload_profile_picture(
+def upload_profile_picture(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -236,30 +464,25 @@ async def upload_profile_picture(
     # Validate file type
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
-    
-    # Validate file size (max 5MB)
-    if file.size > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 5MB")
-    
-    # Create uploads directory if it doesn't exist
-    uploads_dir = Path("uploads")
-    uploads_dir.mkdir(exist_ok=True)
+    refresh_current_user(db, current_user)
     
     # Generate unique filename
     file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
     unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = uploads_dir / unique_filename
+    file_path = UPLOADS_DIR / unique_filename
     
     try:
         # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        _save_upload(file, file_path)
         
         # Update user's photo_url in database
         current_user.photo_url = f"/uploads/{unique_filename}"
         db.commit()
         
         return {"photo_url": current_user.photo_url}
+    except HTTPException:
+        file_path.unlink(missing_ok=True)
+        raise
     except Exception as e:
         # Clean up file if database update fails
         if file_path.exists():
@@ -268,17 +491,13 @@ async def upload_profile_picture(
 
 # User management endpoints
 @app.post("/users", response_model=schemas.User)
-async def create_user(
+def create_user(
     user: schemas.UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     # Only admin can create users
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    db_user = get_user_by_email(db, email=user.email)
-    if db_user:
+    if db.scalar(EMAIL_TAKEN, {"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     hashed_password = get_password_hash(user.password)
@@ -293,142 +512,124 @@ async def create_user(
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 @app.get("/salespersons", response_model=List[schemas.User])
-async def get_all_salespersons(
+def get_all_salespersons(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return db.query(User).filter(User.role == "salesperson").all()
+    return json_list(schemas.USER_LIST, [schemas.User.from_orm_trusted(sp) for sp in db.scalars(SALESPERSONS)])
 
 @app.get("/salespersons/nearby", response_model=List[schemas.SalespersonWithDistance])
-async def get_nearby_salespersons(
+def get_nearby_salespersons(
     lat: float,
     lng: float,
+    radius_km: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    salespeople = db.query(User).filter(
-        User.role == "salesperson",
-        User.current_latitude.isnot(None),
-        User.current_longitude.isnot(None)
-    ).all()
-    
-    sorted_salespeople = sort_salespeople_by_distance(salespeople, lat, lng)
-    
-    result = []
-    for salesperson, distance in sorted_salespeople:
-        salesperson_data = schemas.SalespersonWithDistance(
-            id=salesperson.id,
-            full_name=salesperson.full_name,
-            phone=salesperson.phone,
-            email=salesperson.email,
-            designation=salesperson.designation,
-            photo_url=salesperson.photo_url,
-            current_latitude=salesperson.current_latitude,
-            current_longitude=salesperson.current_longitude,
-            last_location_update=salesperson.last_location_update,
-            status=salesperson.status,
-            distance_km=round(distance, 2)
-        )
-        result.append(salesperson_data)
-    
-    return result
+    query = NEARBY_SALESPERSONS
+    if radius_km is not None:
+        # Bounding-box prefilter in SQL, exact cut-off below
+        lat_min, lat_max, lng_ranges = bounding_box(lat, lng, radius_km)
+        query = query.where(User.current_latitude.between(lat_min, lat_max))
+        if lng_ranges is not None:
+            query = query.where(or_(*(User.current_longitude.between(lo, hi) for lo, hi in lng_ranges)))
+    
+    # The nearest `limit` are the same before and after the radius cut-off
+    sorted_salespeople = sort_salespeople_by_distance(db.execute(query).all(), lat, lng, k=limit)
+    if radius_km is not None:
+        sorted_salespeople = [(sp, d) for sp, d in sorted_salespeople if d <= radius_km]
+    
+    return json_list(schemas.SALESPERSON_DISTANCE_LIST, [
+        schemas.SalespersonWithDistance.from_orm_with_distance(salesperson, distance)
+        for salesperson, distance in sorted_salespeople
+    ])
 
 # Location update endpoint
 @app.post("/salesperson/location")
-async def update_location(
+def update_location(
     location: schemas.LocationUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RoleChecker({"salesperson"}, detail="Only salespersons can update location"))
 ):
-    if current_user.role != "salesperson":
-        raise HTTPException(status_code=403, detail="Only salespersons can update location")
-    
+    refresh_current_user(db, current_user)
     current_user.current_latitude = location.latitude
     current_user.current_longitude = location.longitude
-    current_user.last_location_update = datetime.utcnow()
+    current_user.last_location_update = datetime.now(timezone.utc)
     
     db.commit()
-    db.refresh(current_user)
     
     return {"message": "Location updated successfully"}
 
 # Lead management endpoints
 @app.post("/leads", response_model=schemas.Lead)
-async def create_lead(
+def create_lead(
     lead: schemas.LeadCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_crm)
 ):
-    if current_user.role not in ["crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     db_lead = Lead(
         **lead.dict(),
         created_by=current_user.id
     )
     db.add(db_lead)
     db.commit()
-    db.refresh(db_lead)
     return db_lead
 
 @app.get("/leads", response_model=List[schemas.Lead])
-async def get_leads(
+def get_leads(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return db.query(Lead).offset(skip).limit(limit).all()
+    rows = db.execute(LEAD_ROWS.offset(skip).limit(limit)).mappings()
+    return json_list(schemas.LEAD_LIST, [schemas.Lead.model_construct(**row) for row in rows])
 
 # DELETE endpoint for lead deletion
 @app.delete("/leads/{lead_id}")
-async def delete_lead(
+def delete_lead(
     lead_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_crm)
 ):
     """Delete a lead - Available to CRM and Admin users"""
-    if current_user.role not in ["crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    # Check if lead exists
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
-    
+    # Plain DELETE/UPDATE statements: nothing is loaded into the session
     # Delete associated assignments first
-    db.query(Assignment).filter(Assignment.lead_id == lead_id).delete()
+    db.query(Assignment).filter(Assignment.lead_id == lead_id).delete(synchronize_session=False)
     
-    # Delete the lead
-    db.delete(lead)
+    # Keep pre-leads that were converted into this lead, minus the link
+    db.query(PreLead).filter(PreLead.converted_to_lead_id == lead_id).update(
+        {PreLead.converted_to_lead_id: None}, synchronize_session=False
+    )
+    
+    # Delete the lead; no row deleted means it didn't exist
+    if not db.query(Lead).filter(Lead.id == lead_id).delete(synchronize_session=False):
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Lead not found")
     db.commit()
     
     return {"message": f"Lead {lead_id} deleted successfully"}
 
 # Assignment endpoints
 @app.post("/assign", response_model=schemas.Assignment)
-async def assign_lead_to_salesperson(
+def assign_lead_to_salesperson(
     assignment: schemas.AssignmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_crm)
 ):
-    if current_user.role not in ["crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    # Check if lead exists
-    lead = db.query(Lead).filter(Lead.id == assignment.lead_id).first()
-    if not lead:
+    # Check that the lead and salesperson exist
+    row = db.execute(
+        LEAD_WITH_SALESPERSON,
+        {"lead_id": assignment.lead_id, "salesperson_id": assignment.salesperson_id}
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Lead not found")
     
-    # Check if salesperson exists
-    salesperson = db.query(User).filter(
-        User.id == assignment.salesperson_id,
-        User.role == "salesperson"
-    ).first()
+    lead, salesperson = row
     if not salesperson:
         raise HTTPException(status_code=404, detail="Salesperson not found")
     
@@ -448,78 +649,69 @@ async def assign_lead_to_salesperson(
     
     db.add(db_assignment)
     db.commit()
-    db.refresh(db_assignment)
     
     return db_assignment
 
 @app.get("/assignments", response_model=List[schemas.Assignment])
-async def get_assignments(
+def get_assignments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.role == "salesperson":
-        return db.query(Assignment).filter(Assignment.salesperson_id == current_user.id).all()
+        assignments = db.scalars(ASSIGNMENTS_BY_SALESPERSON, {"salesperson_id": current_user.id})
     else:
-        return db.query(Assignment).all()
+        assignments = db.scalars(ASSIGNMENTS)
+    return json_list(schemas.ASSIGNMENT_LIST, [schemas.Assignment.from_orm_trusted(a) for a in assignments])
 
 @app.put("/assignments/{assignment_id}", response_model=schemas.Assignment)
-async def update_assignment_status(
+def update_assignment_status(
     assignment_id: int,
     status_update: schemas.AssignmentStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RoleChecker({"salesperson", "crm", "admin"}))
 ):
-    # Get the assignment
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    # Get the assignment together with its salesperson in one query
+    assignment = (
+        db.query(Assignment)
+        .options(joinedload(Assignment.salesperson))
+        .filter(Assignment.id == assignment_id)
+        .first()
+    )
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
     # Check permissions - salesperson can only update their own assignments
     if current_user.role == "salesperson" and assignment.salesperson_id != current_user.id:
         raise HTTPException(status_code=403, detail="Can only update your own assignments")
-    elif current_user.role not in ["salesperson", "crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    # Validate status values
-    valid_statuses = ["pending", "accepted", "in_progress", "completed", "rejected"]
-    if status_update.status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
     
     # Update assignment
-    assignment.status = status_update.status
+    assignment.status = status_update.status.value
     if status_update.notes:
         assignment.notes = status_update.notes
     
     # Update completion timestamp if status is completed
-    if status_update.status == "completed":
-        assignment.completed_at = datetime.utcnow()
+    if status_update.status is schemas.AssignmentStatus.completed:
+        assignment.completed_at = datetime.now(timezone.utc)
         # Update salesperson status back to available
-        salesperson = db.query(User).filter(User.id == assignment.salesperson_id).first()
-        if salesperson:
-            salesperson.status = "available"
-    elif status_update.status == "in_progress":
+        if assignment.salesperson:
+            assignment.salesperson.status = "available"
+    elif status_update.status is schemas.AssignmentStatus.in_progress:
         # Update salesperson status to busy
-        salesperson = db.query(User).filter(User.id == assignment.salesperson_id).first()
-        if salesperson:
-            salesperson.status = "busy"
+        if assignment.salesperson:
+            assignment.salesperson.status = "busy"
     
     db.commit()
-    db.refresh(assignment)
     return assignment
 
 # Admin and HR user management endpoints
 @app.post("/admin/users", response_model=schemas.User)
-async def create_user_by_admin(
+def create_user_by_admin(
     user: schemas.UserCreateByAdmin,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_management)
 ):
-    if current_user.role not in ["admin", "hr", "executive"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
+    if db.scalar(EMAIL_TAKEN, {"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Validate role
@@ -542,30 +734,74 @@ async def create_user_by_admin(
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     
     return db_user
 
-@app.get("/admin/users", response_model=List[schemas.User])
-async def get_all_users(
+@app.post("/admin/users/bulk", response_model=List[schemas.User])
+def create_users_by_admin(
+    users: List[schemas.UserCreateByAdmin],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_management)
 ):
-    if current_user.role not in ["admin", "hr", "executive"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    """Create many users in one transaction with a single multi-row INSERT"""
+    if not users:
+        return []
     
-    return db.query(User).all()
+    # Same checks as single-user creation, applied to the whole batch up front
+    valid_roles = ["salesperson", "crm", "admin", "hr", "executive"]
+    emails = set()
+    for user in users:
+        if user.role not in valid_roles:
+            raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {valid_roles}")
+        if user.role in ["admin", "hr", "executive"] and current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Only admin can create admin, hr, or executive users")
+        if user.email in emails:
+            raise HTTPException(status_code=400, detail=f"Duplicate email in request: {user.email}")
+        emails.add(user.email)
+    
+    existing = db.scalars(select(User.email).where(User.email.in_(emails))).first()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Email already registered: {existing}")
+    
+    # Password hashing dominates; spread it over the hashing pool
+    hashes = list(get_hash_executor().map(get_password_hash, [user.password for user in users]))
+    
+    user_ids = bulk_insert_users(db, [
+        {
+            "email": user.email,
+            "hashed_password": hashed_password,
+            "full_name": user.full_name,
+            "role": user.role,
+            "phone": user.phone,
+            "designation": user.designation,
+            "photo_url": user.photo_url,
+            "territory": user.territory,
+        }
+        for user, hashed_password in zip(users, hashes)
+    ])
+    db.commit()
+    
+    created = db.scalars(
+        select(User).where(User.id.in_(user_ids)).order_by(User.id).options(USER_PUBLIC, raiseload("*"))
+    )
+    return json_list(schemas.USER_LIST, [schemas.User.from_orm_trusted(u) for u in created])
+
+@app.get("/admin/users", response_model=List[schemas.User])
+def get_all_users(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_management)
+):
+    # Columns come straight from the DB, so skip validation
+    rows = db.execute(USER_ROWS).mappings()
+    return json_list(schemas.USER_LIST, [schemas.User.model_construct(**row) for row in rows])
 
 @app.delete("/admin/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RoleChecker({"admin"}, detail="Only admin can delete users"))
 ):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can delete users")
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -573,22 +809,24 @@ async def delete_user(
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
+    # Detach records that only reference the user as their author
+    db.query(Lead).filter(Lead.created_by == user_id).update({Lead.created_by: None})
+    db.query(PreLead).filter(PreLead.created_by == user_id).update({PreLead.created_by: None})
+    db.query(Assignment).filter(Assignment.assigned_by == user_id).update({Assignment.assigned_by: None})
+    
     db.delete(user)
     db.commit()
     
     return {"message": "User deleted successfully"}
 
 @app.put("/admin/users/{user_id}", response_model=schemas.User)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_management)
 ):
-    if current_user.role not in ["admin", "hr", "executive"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -598,20 +836,16 @@ async def update_user(
         setattr(user, field, value)
     
     db.commit()
-    db.refresh(user)
     
     return user
 
 # Pre-lead management endpoints
 @app.post("/pre-leads", response_model=schemas.PreLead)
-async def create_pre_lead(
+def create_pre_lead(
     pre_lead: schemas.PreLeadCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_crm)
 ):
-    if current_user.role not in ["crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     from database import PreLead
     db_pre_lead = PreLead(
         **pre_lead.dict(),
@@ -619,32 +853,29 @@ async def create_pre_lead(
     )
     db.add(db_pre_lead)
     db.commit()
-    db.refresh(db_pre_lead)
     return db_pre_lead
 
 @app.get("/pre-leads", response_model=List[schemas.PreLead])
-async def get_pre_leads(
+def get_pre_leads(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     from database import PreLead
-    return db.query(PreLead).offset(skip).limit(limit).all()
+    pre_leads = db.query(PreLead).options(raiseload("*")).offset(skip).limit(limit)
+    return json_list(schemas.PRE_LEAD_LIST, [schemas.PreLead.from_orm_trusted(p) for p in pre_leads])
 
 @app.post("/pre-leads/{pre_lead_id}/convert", response_model=schemas.Lead)
-async def convert_pre_lead_to_lead(
+def convert_pre_lead_to_lead(
     pre_lead_id: int,
     convert_data: schemas.PreLeadToLeadConvert,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_crm)
 ):
-    if current_user.role not in ["crm", "admin"]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     from database import PreLead
     # Get the pre-lead
-    pre_lead = db.query(PreLead).filter(PreLead.id == pre_lead_id).first()
+    pre_lead = db.get(PreLead, pre_lead_id)
     if not pre_lead:
         raise HTTPException(status_code=404, detail="Pre-lead not found")
     
@@ -666,12 +897,11 @@ async def convert_pre_lead_to_lead(
         created_by=current_user.id
     )
     db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+    db.flush()  # INSERT now to get the lead id; committed together with the pre-lead
     
     # Update pre-lead to mark as converted
     pre_lead.converted_to_lead_id = db_lead.id
-    pre_lead.converted_at = datetime.utcnow()
+    pre_lead.converted_at = datetime.now(timezone.utc)
     db.commit()
     
     return db_lead
@@ -682,4 +912,4 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -5,8 +5,10 @@ Monitor database size, query performance, and provide recommendations
 """
 import sqlite3
 import os
-import time
+import statistics
+from array import array
 from datetime import datetime
+from time import perf_counter_ns
 
 def get_db_stats(db_path):
     """Get comprehensive database statistics"""
@@ -80,43 +82,49 @@ def benchmark_queries(db_path, num_tests=10):
         return None
     
     conn = sqlite3.connect(db_path)
+    # Refresh planner statistics so the timings reflect the indexed plans
+    conn.execute("PRAGMA optimize")
     cursor = conn.cursor()
     
     benchmarks = {}
     
+    # Each query is (sql, params). Fixed strings hit sqlite3's statement
+    # cache after the first run, so repeats time execution, not parsing.
+    # Scans select only ids so row marshalling doesn't dominate.
     queries = {
-        'select_all_users': "SELECT * FROM users",
-        'select_all_leads': "SELECT * FROM leads", 
-        'join_assignments': """
+        'select_all_users': ("SELECT id FROM users", ()),
+        'select_all_leads': ("SELECT id FROM leads", ()),
+        'join_assignments': ("""
             SELECT u.full_name, l.company_name, a.assigned_at 
             FROM assignments a 
             JOIN users u ON a.salesperson_id = u.id 
             JOIN leads l ON a.lead_id = l.id
-        """,
-        'count_leads_by_status': "SELECT status, COUNT(*) FROM leads GROUP BY status",
-        'search_leads': "SELECT * FROM leads WHERE company_name LIKE '%Tech%'"
+        """, ()),
+        'count_leads_by_status': ("SELECT status, COUNT(*) FROM leads GROUP BY status", ()),
+        # A leading wildcard can't use an index; this times the full scan
+        'search_leads': ("SELECT id FROM leads WHERE company_name LIKE ?", ('%Tech%',))
     }
     
     try:
-        for query_name, query in queries.items():
-            times = []
+        for query_name, (query, params) in queries.items():
+            times = array('q', [0]) * num_tests  # nanoseconds per run
             
-            for _ in range(num_tests):
-                start_time = time.time()
-                cursor.execute(query)
+            for i in range(num_tests):
+                start_ns = perf_counter_ns()
+                cursor.execute(query, params)
                 results = cursor.fetchall()
-                end_time = time.time()
-                
-                times.append((end_time - start_time) * 1000)  # Convert to ms
+                times[i] = perf_counter_ns() - start_ns
             
-            avg_time = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
+            # 19 cut points at 5% steps: index 9 is p50, index 18 is p95
+            cuts = statistics.quantiles(times, n=20)
+            to_ms = lambda ns: round(ns / 1_000_000, 3)
             
             benchmarks[query_name] = {
-                'avg_ms': round(avg_time, 2),
-                'min_ms': round(min_time, 2),
-                'max_ms': round(max_time, 2),
+                'avg_ms': to_ms(statistics.fmean(times)),
+                'min_ms': to_ms(min(times)),
+                'max_ms': to_ms(max(times)),
+                'p50_ms': to_ms(cuts[9]),
+                'p95_ms': to_ms(cuts[18]),
                 'result_count': len(results)
             }
             
@@ -189,6 +197,7 @@ def main():
         for query, metrics in benchmarks.items():
             print(f"{query}:")
             print(f"  Average: {metrics['avg_ms']}ms")
+            print(f"  p50/p95: {metrics['p50_ms']}ms / {metrics['p95_ms']}ms")
             print(f"  Results: {metrics['result_count']} rows")
     else:
         print("❌ Benchmark failed:", benchmarks.get('error', 'Unknown error'))
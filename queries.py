@@ -0,0 +1,55 @@
+"""
+Prebuilt statements for the hot query paths.
+
+Building these once at import time lets SQLAlchemy's compiled-statement
+cache reuse the same SQL string on every request; call sites only supply
+the bound parameters, e.g. db.execute(USER_BY_EMAIL, {"email": email}).
+"""
+from sqlalchemy import select, bindparam, and_, exists
+from sqlalchemy.orm import defer, raiseload
+
+from database import User, Lead, Assignment
+import schemas
+
+
+def columns_for(model, schema):
+    """Model columns backing each field of a response schema"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+# Auth lookups (login and every authenticated request)
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Duplicate-email check on user creation: a single 0/1, no row fetched
+EMAIL_TAKEN = select(exists().where(User.email == bindparam("email")))
+
+# Loader option for user listings: never pull the password hash, which
+# the response schemas don't expose
+USER_PUBLIC = defer(User.hashed_password, raiseload=True)
+
+# Column projections for list endpoints: only what the response schema
+# needs, returned as plain rows without ORM hydration
+USER_ROWS = select(*columns_for(User, schemas.User))
+LEAD_ROWS = select(*columns_for(Lead, schemas.Lead))
+
+# Salesperson listings
+SALESPERSONS = select(User).where(User.role == "salesperson").options(USER_PUBLIC, raiseload("*"))
+
+# Nearby ranking: the response columns (everything but the computed
+# distance) as plain rows for located salespeople, without ORM hydration
+NEARBY_SALESPERSONS = select(
+    *(getattr(User, name) for name in schemas.SalespersonWithDistance.model_fields if name != "distance_km")
+).where(
+    User.role == "salesperson",
+    User.current_latitude.isnot(None),
+    User.current_longitude.isnot(None)
+)
+
+# Assignment listings
+ASSIGNMENTS = select(Assignment).options(raiseload("*"))
+ASSIGNMENTS_BY_SALESPERSON = ASSIGNMENTS.where(Assignment.salesperson_id == bindparam("salesperson_id"))
+
+# Lead assignment: the lead and the target salesperson in one round trip
+# (salesperson is None when the id isn't a salesperson)
+LEAD_WITH_SALESPERSON = select(Lead, User).outerjoin(
+    User, and_(User.id == bindparam("salesperson_id"), User.role == "salesperson")
+).where(Lead.id == bindparam("lead_id"))
@@ -1,27 +1,40 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
+from typing import Annotated, Literal, Optional, List
+from dataclasses import dataclass
 from datetime import datetime
+from enum import Enum
+
+# Response schemas built from ORM rows are read-only snapshots
+ORM_CONFIG = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+class TrustedConstruct:
+    """Mixin for response schemas whose data comes straight from our own DB"""
+    @classmethod
+    def from_orm_trusted(cls, obj):
+        """Build from an ORM object without re-running field validators"""
+        return cls.model_construct(**{name: getattr(obj, name) for name in cls.model_fields})
+
+# Lead priority and pre-lead classification. Request bodies are checked
+# against the literal set; response schemas keep plain str for stored rows
+Temperature = Literal["hot", "warm", "cold"]
+
+# Email on response schemas: the value was validated when it was written,
+# so skip EmailStr's validator and only keep the documented format
+TrustedEmail = Annotated[str, Field(json_schema_extra={"format": "email"})]
 
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
     full_name: str
     role: str
-
-class UserCreate(UserBase):
-    password: str
     phone: Optional[str] = None
     designation: Optional[str] = None
     photo_url: Optional[str] = None
 
-class UserCreateByAdmin(BaseModel):
-    email: EmailStr
+class UserCreate(UserBase):
     password: str
-    full_name: str
-    role: str
-    phone: Optional[str] = None
-    designation: Optional[str] = None
-    photo_url: Optional[str] = None
+
+class UserCreateByAdmin(UserCreate):
     territory: Optional[str] = None
 
 class UserUpdate(BaseModel):
@@ -32,11 +45,9 @@ class UserUpdate(BaseModel):
     status: Optional[str] = None
     territory: Optional[str] = None
 
-class User(UserBase):
+class User(UserBase, TrustedConstruct):
+    email: TrustedEmail
     id: int
-    phone: Optional[str] = None
-    designation: Optional[str] = None
-    photo_url: Optional[str] = None
     current_latitude: Optional[float] = None
     current_longitude: Optional[float] = None
     last_location_update: Optional[datetime] = None
@@ -45,8 +56,7 @@ class User(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_CONFIG
 
 # Location schemas
 class LocationUpdate(BaseModel):
@@ -67,16 +77,16 @@ class LeadBase(BaseModel):
     notes: Optional[str] = None
 
 class LeadCreate(LeadBase):
-    pass
+    priority: Temperature = "warm"
 
-class Lead(LeadBase):
+class Lead(LeadBase, TrustedConstruct):
+    email: Optional[TrustedEmail] = None
     id: int
     status: str
     created_by: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_CONFIG
 
 # Assignment schemas
 class AssignmentCreate(BaseModel):
@@ -84,11 +94,18 @@ class AssignmentCreate(BaseModel):
     salesperson_id: int
     notes: Optional[str] = None
 
+class AssignmentStatus(str, Enum):
+    pending = "pending"
+    accepted = "accepted"
+    in_progress = "in_progress"
+    completed = "completed"
+    rejected = "rejected"
+
 class AssignmentStatusUpdate(BaseModel):
-    status: str
+    status: AssignmentStatus  # unknown values are rejected with a 422
     notes: Optional[str] = None
 
-class Assignment(BaseModel):
+class Assignment(BaseModel, TrustedConstruct):
     id: int
     lead_id: int
     salesperson_id: int
@@ -97,15 +114,18 @@ class Assignment(BaseModel):
     status: str
     notes: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_CONFIG
 
 # Auth schemas
-class Token(BaseModel):
+# Token payloads carry no validation of their own, so plain slotted
+# dataclasses are enough (FastAPI still accepts Token as a response_model)
+@dataclass(slots=True, frozen=True)
+class Token:
     access_token: str
     token_type: str
 
-class TokenData(BaseModel):
+@dataclass(slots=True, frozen=True)
+class TokenData:
     email: Optional[str] = None
 
 class LoginRequest(BaseModel):
@@ -126,8 +146,13 @@ class SalespersonWithDistance(BaseModel):
     status: str
     distance_km: float
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_CONFIG
+
+    @classmethod
+    def from_orm_with_distance(cls, salesperson, distance_km: float) -> "SalespersonWithDistance":
+        """Build from a User row without re-validating fields the DB already guarantees"""
+        data = {name: getattr(salesperson, name) for name in cls.model_fields if name != "distance_km"}
+        return cls.model_construct(**data, distance_km=round(distance_km, 2))
 
 # Pre-lead schemas
 class PreLeadBase(BaseModel):
@@ -139,17 +164,16 @@ class PreLeadBase(BaseModel):
     notes: Optional[str] = None
 
 class PreLeadCreate(PreLeadBase):
-    pass
+    classification: Temperature = "warm"
 
-class PreLead(PreLeadBase):
+class PreLead(PreLeadBase, TrustedConstruct):
     id: int
     created_by: Optional[int] = None
     created_at: datetime
     converted_to_lead_id: Optional[int] = None
     converted_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_CONFIG
 
 class PreLeadToLeadConvert(BaseModel):
     contact_person: str
@@ -158,6 +182,14 @@ class PreLeadToLeadConvert(BaseModel):
     address: Optional[str] = None
     latitude: float
     longitude: float
-    priority: str = "warm"
+    priority: Temperature = "warm"
     estimated_value: Optional[float] = None
     notes: Optional[str] = None
+
+# List serializers for endpoints that already hold schema instances:
+# dump_json() writes the whole list to JSON bytes in one call
+USER_LIST = TypeAdapter(List[User])
+LEAD_LIST = TypeAdapter(List[Lead])
+ASSIGNMENT_LIST = TypeAdapter(List[Assignment])
+PRE_LEAD_LIST = TypeAdapter(List[PreLead])
+SALESPERSON_DISTANCE_LIST = TypeAdapter(List[SalespersonWithDistance])
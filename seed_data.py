@@ -4,17 +4,28 @@ Seed script to populate the database with demo data
 """
 import sys
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
 
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(__file__))
 
-from database import SessionLocal, User, Lead, Assignment, PreLead
-from auth import get_password_hash
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import User, Lead, Assignment, PreLead
+from auth import get_password_hash, get_hash_executor
+
+def insert_ignoring_duplicates(db, model, index_elements):
+    """INSERT that skips rows conflicting on index_elements (ON CONFLICT DO NOTHING)"""
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
 
 def create_demo_users(db):
     """Create demo users for testing"""
+    now = datetime.now(timezone.utc)
     users = [
         {
             "email": "admin@bonhoeffer.com",
@@ -48,7 +59,7 @@ def create_demo_users(db):
             "phone": "+91 98765 43210",
             "current_latitude": 28.6139,  # Delhi
             "current_longitude": 77.2090,
-            "last_location_update": datetime.utcnow(),
+            "last_location_update": now,
             "territory": "Delhi"
         },
         {
@@ -59,7 +70,7 @@ def create_demo_users(db):
             "phone": "+91 98765 43211",
             "current_latitude": 19.0760,  # Mumbai
             "current_longitude": 72.8777,
-            "last_location_update": datetime.utcnow(),
+            "last_location_update": now,
             "territory": "Maharashtra"
         },
         {
@@ -70,7 +81,7 @@ def create_demo_users(db):
             "phone": "+91 98765 43212",
             "current_latitude": 12.9716,  # Bangalore
             "current_longitude": 77.5946,
-            "last_location_update": datetime.utcnow(),
+            "last_location_update": now,
             "territory": "Karnataka"
         },
         {
@@ -81,7 +92,7 @@ def create_demo_users(db):
             "phone": "+91 98765 43213", 
             "current_latitude": 22.5726,  # Kolkata
             "current_longitude": 88.3639,
-            "last_location_update": datetime.utcnow(),
+            "last_location_update": now,
             "territory": "West Bengal"
         },
         {
@@ -92,15 +103,27 @@ def create_demo_users(db):
             "phone": "+91 98765 43214",
             "current_latitude": 23.0225,  # Ahmedabad
             "current_longitude": 72.5714,
-            "last_location_update": datetime.utcnow(),
+            "last_location_update": now,
             "territory": "Gujarat"
         }
     ]
     
-    created_users = []
+    # One query for every demo user that already exists
+    existing_users = {
+        user.email: user
+        for user in db.scalars(select(User).where(User.email.in_([data["email"] for data in users])))
+    }
+    
+    # Hash the new users' passwords in parallel on the shared hashing pool
+    executor = get_hash_executor()
+    password_hashes = {
+        data["email"]: executor.submit(get_password_hash, data["password"])
+        for data in users if data["email"] not in existing_users
+    }
+    
+    new_users = []
     for user_data in users:
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data["email"]).first()
+        existing_user = existing_users.get(user_data["email"])
         if existing_user:
             # Update existing user with territory if it's missing
             if hasattr(existing_user, 'territory') and existing_user.territory is None and user_data.get("territory"):
@@ -109,26 +132,33 @@ def create_demo_users(db):
                 print(f"Updated territory for existing user: {user_data['email']} -> {user_data.get('territory')}")
             else:
                 print(f"User {user_data['email']} already exists, skipping...")
-            created_users.append(existing_user)
             continue
             
-        user = User(
-            email=user_data["email"],
-            hashed_password=get_password_hash(user_data["password"]),
-            full_name=user_data["full_name"],
-            role=user_data["role"],
-            phone=user_data.get("phone"),
-            current_latitude=user_data.get("current_latitude"),
-            current_longitude=user_data.get("current_longitude"),
-            last_location_update=user_data.get("last_location_update"),
-            territory=user_data.get("territory")
-        )
-        db.add(user)
-        created_users.append(user)
+        new_users.append({
+            "email": user_data["email"],
+            "hashed_password": password_hashes[user_data["email"]].result(),
+            "full_name": user_data["full_name"],
+            "role": user_data["role"],
+            "phone": user_data.get("phone"),
+            "current_latitude": user_data.get("current_latitude"),
+            "current_longitude": user_data.get("current_longitude"),
+            "last_location_update": user_data.get("last_location_update"),
+            "territory": user_data.get("territory")
+        })
         print(f"Created user: {user_data['email']} (password: {user_data['password']})")
     
+    if new_users:
+        # One INSERT for all new users; the unique email index (not a Python
+        # check) drops any row another seeding run inserted in the meantime
+        stmt = insert_ignoring_duplicates(db, User, [User.email]).values(new_users).returning(User)
+        existing_users.update((user.email, user) for user in db.scalars(stmt))
+        missing = [data["email"] for data in users if data["email"] not in existing_users]
+        if missing:
+            existing_users.update(
+                (user.email, user) for user in db.scalars(select(User).where(User.email.in_(missing)))
+            )
     db.commit()
-    return created_users
+    return [existing_users[data["email"]] for data in users]
 
 def create_demo_leads(db):
     """Create demo leads across India"""
@@ -239,20 +269,26 @@ def create_demo_leads(db):
         }
     ]
     
+    existing_leads = {
+        lead.email: lead
+        for lead in db.scalars(select(Lead).where(Lead.email.in_([data["email"] for data in leads_data])))
+    }
+    
     created_leads = []
+    new_leads = []
     for lead_data in leads_data:
-        # Check if lead already exists
-        existing_lead = db.query(Lead).filter(Lead.email == lead_data["email"]).first()
+        existing_lead = existing_leads.get(lead_data["email"])
         if existing_lead:
             print(f"Lead {lead_data['company_name']} already exists, skipping...")
             created_leads.append(existing_lead)
             continue
             
         lead = Lead(**lead_data)
-        db.add(lead)
+        new_leads.append(lead)
         created_leads.append(lead)
         print(f"Created lead: {lead_data['company_name']} in {lead_data['address']}")
     
+    db.add_all(new_leads)
     db.commit()
     return created_leads
 
@@ -285,14 +321,19 @@ def create_demo_assignments(db, users, leads):
         }
     ]
     
+    existing_assignments = {
+        (a.lead_id, a.salesperson_id): a
+        for a in db.scalars(select(Assignment).where(
+            Assignment.lead_id.in_([data["lead"].id for data in assignments_data])
+        ))
+    }
+    
     created_assignments = []
+    new_assignments = []
     for assignment_data in assignments_data:
-        # Check if assignment already exists
-        existing_assignment = db.query(Assignment).filter(
-            Assignment.lead_id == assignment_data["lead"].id,
-            Assignment.salesperson_id == assignment_data["salesperson"].id
-        ).first()
-        
+        existing_assignment = existing_assignments.get(
+            (assignment_data["lead"].id, assignment_data["salesperson"].id)
+        )
         if existing_assignment:
             print(f"Assignment for {assignment_data['lead'].company_name} already exists, skipping...")
             created_assignments.append(existing_assignment)
@@ -304,10 +345,11 @@ def create_demo_assignments(db, users, leads):
             status=assignment_data["status"],
             notes=assignment_data["notes"]
         )
-        db.add(assignment)
+        new_assignments.append(assignment)
         created_assignments.append(assignment)
         print(f"Created assignment: {assignment_data['lead'].company_name} -> {assignment_data['salesperson'].full_name}")
     
+    db.add_all(new_assignments)
     db.commit()
     return created_assignments
 
@@ -383,12 +425,17 @@ def create_demo_preleads(db, users):
         }
     ]
     
+    existing_preleads = {
+        prelead.company_name: prelead
+        for prelead in db.scalars(select(PreLead).where(
+            PreLead.company_name.in_([data["company_name"] for data in preleads_data])
+        ))
+    }
+    
     created_preleads = []
+    new_preleads = []
     for prelead_data in preleads_data:
-        # Check if pre-lead already exists
-        existing_prelead = db.query(PreLead).filter(
-            PreLead.company_name == prelead_data["company_name"]
-        ).first()
+        existing_prelead = existing_preleads.get(prelead_data["company_name"])
         if existing_prelead:
             print(f"Pre-lead {prelead_data['company_name']} already exists, skipping...")
             created_preleads.append(existing_prelead)
@@ -403,10 +450,11 @@ def create_demo_preleads(db, users):
             notes=prelead_data["notes"],
             created_by=crm_user.id
         )
-        db.add(prelead)
+        new_preleads.append(prelead)
         created_preleads.append(prelead)
         print(f"Created pre-lead: {prelead_data['company_name']} ({prelead_data['country']})")
     
+    db.add_all(new_preleads)
     db.commit()
     return created_preleads
 
@@ -424,7 +472,6 @@ def main():
         connect_args={
             "check_same_thread": False,
             "timeout": 120,  # 2 minute timeout for seeding
-            "isolation_level": None,
         },
         pool_timeout=120,  # Wait up to 2 minutes for a connection
         echo=False
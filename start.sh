@@ -14,17 +14,17 @@ $PIP_CMD install -r requirements.txt
 # Create database tables
 echo "🗄️  Creating database tables..."
 $PYTHON_CMD -c "
-from database import engine, Base
+from database import get_engine, Base
 print('Creating all database tables...')
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=get_engine())
 print('Database tables created successfully!')
 "
 
 # Check if we need to seed initial data
 echo "🌱 Checking for initial data..."
 $PYTHON_CMD -c "
-from database import SessionLocal, User
-db = SessionLocal()
+from database import get_sessionmaker, User
+db = get_sessionmaker()()
 try:
     user_count = db.query(User).count()
     if user_count == 0:
@@ -3,5 +3,8 @@
 # Create data directory
 mkdir -p data
 
-# Start the application
-exec uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000}
\ No newline at end of file
+# Start the application (Render's proxy sets X-Forwarded-For). Only the proxy's
+# own address range is trusted, so uvicorn takes the rightmost hop it didn't
+# add rather than a client-supplied entry, and per-client rate limits can't be
+# dodged by spoofing the header
+exec uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000} --loop uvloop --http httptools --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-10.0.0.0/8}"
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 # Minimal FastAPI app for testing
-app = FastAPI(title="Test API")
+app = FastAPI(title="Test API", default_response_class=ORJSONResponse)
 
 @app.get("/")
 async def root():
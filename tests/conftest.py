@@ -0,0 +1,41 @@
+"""
+Shared fixtures: the app running against a throwaway SQLite database
+seeded with the demo data from seed_data.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Configure before main is imported: settings are read, and the uploads
+# directory is created, at import time
+_workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.sqlite3"
+os.environ["ENVIRONMENT"] = "development"
+os.environ["LOGIN_RATE_LIMIT"] = "1000/minute"
+os.chdir(_workdir)
+sys.path.insert(0, ROOT)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+
+    with TestClient(main.app) as c:
+        # Seeding runs in the background after startup
+        while not main.seed_task.done():
+            time.sleep(0.05)
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    r = client.post("/login", json={"email": "admin@bonhoeffer.com", "password": "admin123"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+_ids = itertools.count()
+
+
+@pytest.fixture
+def place_salesperson(client, admin_headers):
+    """Create a salesperson and report them at the given location"""
+    def place(lat, lng):
+        email = f"nearby{next(_ids)}@example.com"
+        r = client.post("/admin/users", headers=admin_headers, json={
+            "email": email, "full_name": email, "role": "salesperson", "password": "secret123",
+        })
+        assert r.status_code == 200, r.text
+        token = client.post("/login", json={"email": email, "password": "secret123"}).json()["access_token"]
+        r = client.post("/salesperson/location", headers={"Authorization": f"Bearer {token}"},
+                        json={"latitude": lat, "longitude": lng})
+        assert r.status_code == 200, r.text
+        return email
+    return place
+
+
+def nearby(client, headers, lat, lng, radius_km):
+    r = client.get("/salespersons/nearby", headers=headers,
+                   params={"lat": lat, "lng": lng, "radius_km": radius_km})
+    assert r.status_code == 200, r.text
+    return {sp["email"] for sp in r.json()}
+
+
+def test_radius_crosses_antimeridian(client, admin_headers, place_salesperson):
+    east = place_salesperson(-17.0, 179.8)
+    west = place_salesperson(-17.0, -179.6)
+    far = place_salesperson(-17.0, 175.0)
+
+    from_east = nearby(client, admin_headers, -17.0, 179.9, 100)
+    from_west = nearby(client, admin_headers, -17.0, -179.9, 100)
+    assert {east, west} <= from_east and far not in from_east
+    assert {east, west} <= from_west and far not in from_west
+
+
+def test_radius_covering_pole_includes_every_longitude(client, admin_headers, place_salesperson):
+    across_pole = place_salesperson(89.5, -170.0)
+    # 2.5° of arc (~278 km) away, over the pole
+    assert across_pole in nearby(client, admin_headers, 88.0, 10.0, 300)
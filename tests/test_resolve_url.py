@@ -0,0 +1,30 @@
+import pytest
+
+
+def resolve(client, url):
+    r = client.post("/resolve-url", json={"url": url})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.google.com/maps/place/X/@28.6139391,77.2090212,17z", ("28.6139391", "77.2090212")),
+    ("https://www.google.com/maps/@-90,180,3z", ("-90.0", "180.0")),
+    ("https://maps.google.com/?q=28.6,77.2", ("28.6", "77.2")),
+    ("https://www.google.com/maps/place/X/data=!3d19.0760!4d72.8777", ("19.076", "72.8777")),
+    ("https://www.google.com/maps/search/26.851325,+79.746548?entry=tts", ("26.851325", "79.746548")),
+])
+def test_coordinates_extracted(client, url, expected):
+    body = resolve(client, url)
+    assert body["success"] is True
+    assert (body["coordinates"]["lat"], body["coordinates"]["lng"]) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.google.com/maps/@-159,45.563601,15z",
+    "https://www.google.com/maps/@95.5,10.25,3z",
+    "https://www.google.com/maps/@45.5,181.25,3z",
+    "https://maps.google.com/?q=91.0,12.5,7",
+])
+def test_out_of_range_pair_does_not_shift_onto_later_numbers(client, url):
+    assert resolve(client, url)["success"] is False
@@ -0,0 +1,35 @@
+def test_assignment_timestamp_matches_after_reload(client, admin_headers):
+    lead = client.post(
+        "/leads",
+        json={"company_name": "TZ Co", "contact_person": "T", "latitude": 28.6, "longitude": 77.2},
+        headers=admin_headers,
+    ).json()
+    salesperson = client.get("/salespersons", headers=admin_headers).json()[0]
+
+    created = client.post(
+        "/assign",
+        json={"lead_id": lead["id"], "salesperson_id": salesperson["id"]},
+        headers=admin_headers,
+    )
+    assert created.status_code == 200, created.text
+
+    # Served from the in-memory object vs. read back from the database
+    reloaded = client.put(
+        f"/assignments/{created.json()['id']}", json={"status": "accepted"}, headers=admin_headers
+    )
+    assert reloaded.status_code == 200, reloaded.text
+    assert reloaded.json()["assigned_at"] == created.json()["assigned_at"]
+    assert created.json()["assigned_at"].endswith("Z")
+
+
+def test_lead_timestamp_matches_listing(client, admin_headers):
+    created = client.post(
+        "/leads",
+        json={"company_name": "TZ Listing", "contact_person": "T", "latitude": 1.0, "longitude": 2.0},
+        headers=admin_headers,
+    ).json()
+    listed = next(
+        lead for lead in client.get("/leads", params={"limit": 1000}, headers=admin_headers).json()
+        if lead["id"] == created["id"]
+    )
+    assert listed["created_at"] == created["created_at"]
@@ -0,0 +1,74 @@
+import errno
+import os
+from pathlib import Path
+
+from config import settings
+
+
+def test_oversized_upload_rejected_with_cors_headers(client, admin_headers):
+    origin = settings.CORS_ORIGINS[0]
+    r = client.post(
+        "/upload-profile-picture",
+        headers={**admin_headers, "Origin": origin},
+        files={"file": ("big.png", b"\0" * (6 * 1024 * 1024), "image/png")},
+    )
+    assert r.status_code == 413
+    assert r.headers["access-control-allow-origin"] == origin
+
+
+def test_small_upload_passes_through(client, admin_headers):
+    r = client.post(
+        "/upload-profile-picture",
+        headers=admin_headers,
+        files={"file": ("small.png", b"\x89PNG" + os.urandom(1024), "image/png")},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["photo_url"].startswith("/uploads/")
+
+
+def test_chunked_upload_without_content_length_still_limited(client, admin_headers):
+    boundary = "test-boundary"
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode()
+
+    def body():
+        yield head
+        for _ in range(6):
+            yield b"\0" * (1024 * 1024)
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    # A generator body goes out chunked, so the middleware sees no Content-Length
+    r = client.post(
+        "/upload-profile-picture",
+        headers={**admin_headers, "Content-Type": f"multipart/form-data; boundary={boundary}"},
+        content=body(),
+    )
+    assert r.request.headers.get("transfer-encoding") == "chunked"
+    assert "content-length" not in r.request.headers
+    assert r.status_code == 413
+
+
+def _upload(client, headers, data):
+    r = client.post(
+        "/upload-profile-picture",
+        headers=headers,
+        files={"file": ("photo.png", data, "image/png")},
+    )
+    assert r.status_code == 200, r.text
+    return Path(r.json()["photo_url"].lstrip("/")).read_bytes()
+
+
+def test_disk_spooled_upload_saved(client, admin_headers):
+    data = os.urandom(2 * 1024 * 1024)
+    assert _upload(client, admin_headers, data) == data
+
+
+def test_sendfile_failure_falls_back_to_copy(client, admin_headers, monkeypatch):
+    def no_sendfile(*args):
+        raise OSError(errno.ENOTSOCK, "Socket operation on non-socket")
+    monkeypatch.setattr(os, "sendfile", no_sendfile, raising=False)
+    data = os.urandom(2 * 1024 * 1024)
+    assert _upload(client, admin_headers, data) == data
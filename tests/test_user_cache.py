@@ -0,0 +1,24 @@
+from sqlalchemy import text
+
+from database import get_engine
+
+
+def test_user_deleted_by_another_worker_cannot_write(client, admin_headers):
+    email = "stale@example.com"
+    r = client.post("/admin/users", headers=admin_headers, json={
+        "email": email, "full_name": "Stale", "role": "salesperson", "password": "secret123",
+    })
+    assert r.status_code == 200, r.text
+    token = client.post("/login", json={"email": email, "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    location = {"latitude": 12.0, "longitude": 77.0}
+    assert client.post("/salesperson/location", headers=headers, json=location).status_code == 200
+    # The write retired the cached snapshot; a read caches the user again
+    assert client.get("/salespersons", headers=headers).status_code == 200
+
+    # Delete outside the ORM, as another worker would: this process's cache isn't told
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email = :email"), {"email": email})
+
+    r = client.post("/salesperson/location", headers=headers, json=location)
+    assert r.status_code == 401
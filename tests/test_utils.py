@@ -0,0 +1,24 @@
+import math
+
+import numpy as np
+import pytest
+
+import utils
+
+HALF_CIRCUMFERENCE_KM = math.pi * 6371.0
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_antipodal_distance_is_finite(monkeypatch, native):
+    if not native:
+        monkeypatch.setattr(utils, "_haversine_batch", None)
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-90, 90, 1000)
+    lngs = rng.uniform(-180, 180, 1000)
+    for lat, lng in zip(lats, lngs):
+        d = utils.haversine_vec(-lat, lng - math.copysign(180, lng), np.array([lat]), np.array([lng]))
+        assert d[0] == pytest.approx(HALF_CIRCUMFERENCE_KM)
+
+
+def test_haversine_distance_antipodal():
+    assert utils.haversine_distance(10.0, 20.0, -10.0, -160.0) == pytest.approx(HALF_CIRCUMFERENCE_KM)
@@ -1,54 +1,121 @@
-from geopy.distance import geodesic
-from typing import List, Tuple
-import math
+from typing import List, Optional, Tuple
+from math import asin, atan2, cos, sin, sqrt
+
+import numpy as np
+
+try:
+    from numba import njit  # optional: native-code distance kernels
+except ImportError:
+    njit = None
+
+# Haversine constants, folded once instead of converted on every call
+_DEG2RAD = 0.017453292519943295  # pi / 180
+_HALF_DEG2RAD = _DEG2RAD * 0.5
+_EARTH_RADIUS_KM = 6371.0
+_EARTH_DIAMETER_KM = 2 * _EARTH_RADIUS_KM
 
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
     Calculate distance between two points using Haversine formula
     Returns distance in kilometers
     """
-    point1 = (lat1, lng1)
-    point2 = (lat2, lng2)
-    return geodesic(point1, point2).kilometers
+    return haversine_distance(lat1, lng1, lat2, lng2)
+
+def bounding_box(lat: float, lng: float, radius_km: float):
+    """
+    Bounds that contain every point within radius_km of (lat, lng)
+    Returns (lat_min, lat_max, lng_ranges). lng_ranges is None when the
+    circle covers a pole, so every longitude qualifies, and holds two
+    (min, max) ranges when the box crosses the ±180° meridian.
+    """
+    angle = radius_km / _EARTH_RADIUS_KM
+    dlat = angle / _DEG2RAD
+    if abs(lat) + dlat >= 90:
+        return lat - dlat, lat + dlat, None
+    # Widest longitude offset of the circle (narrower than the pole case above)
+    dlng = asin(sin(angle) / cos(lat * _DEG2RAD)) / _DEG2RAD
+    lng_min, lng_max = lng - dlng, lng + dlng
+    if lng_min < -180:
+        lng_ranges = [(lng_min + 360, 180.0), (-180.0, lng_max)]
+    elif lng_max > 180:
+        lng_ranges = [(lng_min, 180.0), (-180.0, lng_max - 360)]
+    else:
+        lng_ranges = [(lng_min, lng_max)]
+    return lat - dlat, lat + dlat, lng_ranges
+
+def haversine_vec(lat0: float, lng0: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    Haversine distance in kilometers from one point to arrays of points
+    """
+    if _haversine_batch is not None:
+        out = np.empty(len(lats), dtype=np.float64)
+        _haversine_batch(lat0, lng0, lats, lngs, out)
+        return out
+    sin_dlat = np.sin((lats - lat0) * _HALF_DEG2RAD)
+    sin_dlon = np.sin((lngs - lng0) * _HALF_DEG2RAD)
+    a = sin_dlat * sin_dlat + cos(lat0 * _DEG2RAD) * np.cos(lats * _DEG2RAD) * sin_dlon * sin_dlon
+    # Rounding can push a just past 1 for antipodal points; sqrt(1 - a) would be NaN
+    a = np.clip(a, 0.0, 1.0)
+    return _EARTH_DIAMETER_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
 def sort_salespeople_by_distance(
     salespeople: List, 
     target_lat: float, 
-    target_lng: float
+    target_lng: float,
+    k: Optional[int] = None
 ) -> List[Tuple[any, float]]:
     """
     Sort salespeople by distance from target location
-    Returns list of tuples (salesperson, distance_km)
+    Returns list of tuples (salesperson, distance_km), only the k nearest if k is given
+    
+    Distances are computed for all salespeople at once with a vectorized
+    Haversine formula; salespeople without a location are skipped.
     """
-    salesperson_distances = []
+    # Missing (or zero) coordinates become NaN and are dropped below
+    lats = np.fromiter((s.current_latitude or np.nan for s in salespeople), dtype=np.float64, count=len(salespeople))
+    lngs = np.fromiter((s.current_longitude or np.nan for s in salespeople), dtype=np.float64, count=len(salespeople))
+    located = np.flatnonzero(~(np.isnan(lats) | np.isnan(lngs)))
     
-    for salesperson in salespeople:
-        if salesperson.current_latitude and salesperson.current_longitude:
-            distance = calculate_distance(
-                target_lat, target_lng,
-                salesperson.current_latitude, salesperson.current_longitude
-            )
-            salesperson_distances.append((salesperson, distance))
+    distances = haversine_vec(target_lat, target_lng, lats[located], lngs[located])
     
-    # Sort by distance
-    salesperson_distances.sort(key=lambda x: x[1])
-    return salesperson_distances
+    # Sort by distance; for top-k, partition the k nearest first and sort only those
+    if k is not None and k < len(distances):
+        nearest = np.argpartition(distances, k)[:k]
+        order = nearest[np.argsort(distances[nearest], kind="stable")]
+    else:
+        order = np.argsort(distances, kind="stable")
+    return [(salespeople[located[i]], float(distances[i])) for i in order]
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Alternative Haversine implementation
     """
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+    lat1_rad = lat1 * _DEG2RAD
+    lat2_rad = lat2 * _DEG2RAD
+    sin_dlat = sin((lat2 - lat1) * _HALF_DEG2RAD)
+    sin_dlon = sin((lon2 - lon1) * _HALF_DEG2RAD)
+    a = sin_dlat * sin_dlat + cos(lat1_rad) * cos(lat2_rad) * sin_dlon * sin_dlon
+    a = min(max(a, 0.0), 1.0)  # see haversine_vec
+    return _EARTH_DIAMETER_KM * atan2(sqrt(a), sqrt(1 - a))
+
+def _jit(func):
+    try:
+        return njit(cache=True, fastmath=True)(func)
+    except RuntimeError:
+        # No writable cache directory (read-only image): compile in memory
+        return njit(fastmath=True)(func)
+
+_haversine_batch = None
+if njit is not None:
+    haversine_distance = _jit(haversine_distance)
+
+    # Serial on purpose: this runs on concurrent request threads, and Numba's
+    # default parallel backend (workqueue) aborts the process on concurrent use
+    @_jit
+    def _haversine_batch(lat0, lng0, lats, lngs, out):
+        for i in range(lats.shape[0]):
+            out[i] = haversine_distance(lat0, lng0, lats[i], lngs[i])
+
+    # Compile (or load from cache) now rather than on the first request
+    haversine_distance(0.0, 0.0, 0.0, 0.0)
+    _haversine_batch(0.0, 0.0, np.zeros(1), np.zeros(1), np.empty(1))